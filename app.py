@@ -1,13 +1,17 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from datetime import datetime
 import sqlite3
 import logging
 import os
+import io
+import csv
 import json
 from app.config import Config
-from app.models import init_db, create_user, get_all_users, get_user_by_id
-from app.utils import validate_user_data, setup_logging
+from app.models import init_db, create_user, get_all_users, get_user_by_id, get_users_by_ids, iter_users, get_user_count, get_user_stats
+from app.utils import validate_user_data, parse_user_ids, parse_non_negative_int, setup_logging
+from app.profiling import init_profiling
+from app.storage import hydrate_database
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -17,9 +21,15 @@ CORS(app)
 setup_logging()
 logger = logging.getLogger(__name__)
 
-# Initialize database
+# Initialize database, hydrating it from a prebuilt snapshot in Lambda
+if app.config['IS_LAMBDA']:
+    hydrate_database()
 init_db()
 
+# Profiling hooks are only registered when enabled, so they cost nothing otherwise
+if app.config['PROFILING_ENABLED']:
+    init_profiling(app)
+
 @app.before_request
 def log_request_info():
     """Log incoming requests"""
@@ -95,11 +105,20 @@ def users():
     """Users endpoint for CRUD operations"""
     try:
         if request.method == 'GET':
-            # Get all users
-            users_data = get_all_users()
+            # Batch lookup when specific IDs are requested
+            if 'ids' in request.args:
+                return batch_lookup_response(request.args.get('ids'))
+            
+            # Get all users, optionally paginated; limit=0 returns only the count
+            limit, limit_error = parse_non_negative_int(request.args.get('limit'))
+            offset, offset_error = parse_non_negative_int(request.args.get('offset'), default=0)
+            if limit_error or offset_error:
+                return jsonify({"error": "limit and offset must be non-negative integers"}), 400
+            
+            users_data = get_all_users(limit=limit, offset=offset) if limit != 0 else []
             return jsonify({
                 "users": users_data,
-                "count": len(users_data),
+                "count": get_user_count(),
                 "timestamp": datetime.utcnow().isoformat()
             }), 200
             
@@ -125,6 +144,99 @@ def users():
         logger.error(f"Error in users endpoint: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route('/api/v1/users/batch-get', methods=['POST'])
+def batch_get_users():
+    """Get many users by ID in a single request"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Request body must be a JSON object"}), 400
+        
+        return batch_lookup_response(data.get('ids'))
+        
+    except Exception as e:
+        logger.error(f"Error in batch-get endpoint: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+def batch_lookup_response(raw_ids):
+    """Build the response for a batch user lookup"""
+    user_ids, error = parse_user_ids(raw_ids, app.config['MAX_BATCH_SIZE'])
+    if error:
+        return jsonify({"error": error}), 400
+    
+    users_data, missing = get_users_by_ids(user_ids)
+    return jsonify({
+        "users": users_data,
+        "count": len(users_data),
+        "missing": missing,
+        "timestamp": datetime.utcnow().isoformat()
+    }), 200
+
+@app.route('/api/v1/users/stats', methods=['GET'])
+def users_stats():
+    """User totals and signup counts read from the summary tables"""
+    try:
+        days, days_error = parse_non_negative_int(request.args.get('days'), default=30)
+        hours, hours_error = parse_non_negative_int(request.args.get('hours'), default=24)
+        if days_error or hours_error:
+            return jsonify({"error": "days and hours must be non-negative integers"}), 400
+        
+        stats = get_user_stats(days=days, hours=hours)
+        stats["timestamp"] = datetime.utcnow().isoformat()
+        return jsonify(stats), 200
+        
+    except Exception as e:
+        logger.error(f"Error in users stats endpoint: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+EXPORT_FIELDS = ['id', 'name', 'email', 'created_at']
+
+@app.route('/api/v1/users/export', methods=['GET'])
+def export_users():
+    """Stream all users as CSV or NDJSON without loading the whole table"""
+    try:
+        export_format = request.args.get('format', 'csv').lower()
+        chunk_size = app.config['EXPORT_CHUNK_SIZE']
+        
+        def generate_csv():
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+            for count, user in enumerate(iter_users(chunk_size), start=1):
+                writer.writerow(user)
+                if count % chunk_size == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        
+        def generate_ndjson():
+            lines = []
+            for user in iter_users(chunk_size):
+                lines.append(json.dumps(user) + '\n')
+                if len(lines) == chunk_size:
+                    yield ''.join(lines)
+                    lines = []
+            yield ''.join(lines)
+        
+        if export_format == 'csv':
+            generator, mimetype = generate_csv, 'text/csv'
+        elif export_format == 'ndjson':
+            generator, mimetype = generate_ndjson, 'application/x-ndjson'
+        else:
+            return jsonify({"error": "Format must be 'csv' or 'ndjson'"}), 400
+        
+        logger.info(f"Exporting users as {export_format}")
+        return Response(
+            stream_with_context(generator()),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename=users.{export_format}'}
+        )
+        
+    except Exception as e:
+        logger.error(f"Error in users export endpoint: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @app.route('/api/v1/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     """Get specific user by ID"""
@@ -201,14 +313,41 @@ def api_docs():
                 },
                 "/api/v1/users": {
                     "get": {
-                        "summary": "Get all users",
-                        "responses": {"200": {"description": "List of users"}}
+                        "summary": "Get all users (?limit=&offset= to paginate, count is the total), or a batch with ?ids=1,2,3",
+                        "responses": {
+                            "200": {"description": "List of users"},
+                            "400": {"description": "Invalid or too many user IDs"}
+                        }
                     },
                     "post": {
                         "summary": "Create new user",
                         "responses": {"201": {"description": "User created"}}
                     }
                 },
+                "/api/v1/users/batch-get": {
+                    "post": {
+                        "summary": "Get many users by ID",
+                        "responses": {
+                            "200": {"description": "Users in request order plus missing IDs"},
+                            "400": {"description": "Invalid or too many user IDs"}
+                        }
+                    }
+                },
+                "/api/v1/users/stats": {
+                    "get": {
+                        "summary": "Total users and signups per day/hour over the last N days/hours in UTC (?days=30&hours=24)",
+                        "responses": {"200": {"description": "User statistics"}}
+                    }
+                },
+                "/api/v1/users/export": {
+                    "get": {
+                        "summary": "Stream all users as CSV (?format=csv) or NDJSON (?format=ndjson)",
+                        "responses": {
+                            "200": {"description": "Streamed user export"},
+                            "400": {"description": "Unsupported export format"}
+                        }
+                    }
+                },
                 "/api/v1/info": {
                     "get": {
                         "summary": "Application information",
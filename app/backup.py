@@ -0,0 +1,63 @@
+import argparse
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+def backup_database(dest_path=None, pages=None, pause=None):
+    """Take a consistent online snapshot of the database using SQLite's backup API"""
+    config = Config()
+    pages = config.BACKUP_PAGES_PER_STEP if pages is None else pages
+    pause = config.BACKUP_STEP_PAUSE if pause is None else pause
+    
+    if dest_path is None:
+        timestamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+        dest_path = os.path.join(config.BACKUP_DIR, f'data-{timestamp}.db')
+    
+    dest_dir = os.path.dirname(os.path.abspath(dest_path))
+    os.makedirs(dest_dir, exist_ok=True)
+    tmp_path = f'{dest_path}.partial'
+    
+    def progress(status, remaining, total):
+        # Pause between steps so foreground writers can take the lock
+        logger.debug(f"Backup progress: {total - remaining}/{total} pages")
+        if remaining and pause:
+            time.sleep(pause)
+    
+    try:
+        source = sqlite3.connect(config.DATABASE_PATH)
+        target = sqlite3.connect(tmp_path)
+        try:
+            source.backup(target, pages=pages, progress=progress)
+        finally:
+            target.close()
+            source.close()
+        
+        os.replace(tmp_path, dest_path)
+        logger.info(f"Database backed up to {dest_path}")
+        return dest_path
+        
+    except Exception as e:
+        logger.error(f"Error backing up database: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def main(argv=None):
+    """Command line entry point: python -m app.backup [destination]"""
+    parser = argparse.ArgumentParser(description="Take an online snapshot of the users database")
+    parser.add_argument('destination', nargs='?', help="Backup file path (defaults to BACKUP_DIR)")
+    parser.add_argument('--pages', type=int, help="Pages copied per backup step")
+    parser.add_argument('--pause', type=float, help="Seconds to pause between steps")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    path = backup_database(args.destination, pages=args.pages, pause=args.pause)
+    print(path)
+
+if __name__ == '__main__':
+    main()
@@ -7,10 +7,35 @@ class Config:
     DEBUG = ENV == 'development'
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
     
-    # Database configuration
+    # Lambda's package directory is read-only; only /tmp is writable
     BASE_DIR = Path(__file__).parent.parent
-    DATABASE_PATH = os.environ.get('DATABASE_PATH', str(BASE_DIR / 'data.db'))
+    IS_LAMBDA = bool(os.environ.get('AWS_LAMBDA_FUNCTION_NAME'))
+    WRITABLE_DIR = Path('/tmp') if IS_LAMBDA else BASE_DIR
+    
+    # Database configuration
+    DATABASE_PATH = os.environ.get('DATABASE_PATH', str(WRITABLE_DIR / 'data.db'))
+    
+    # Prebuilt database snapshot hydrated into DATABASE_PATH once per Lambda container
+    DB_SNAPSHOT_PATH = os.environ.get('DB_SNAPSHOT_PATH', '')
+    DB_SNAPSHOT_S3_BUCKET = os.environ.get('DB_SNAPSHOT_S3_BUCKET', '')
+    DB_SNAPSHOT_S3_KEY = os.environ.get('DB_SNAPSHOT_S3_KEY', 'snapshots/data.db')
+    S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL', '')
+    
+    # Batch lookup configuration
+    MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 100))
+    
+    # Export and backup configuration
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 500))
+    BACKUP_DIR = os.environ.get('BACKUP_DIR', str(WRITABLE_DIR / 'backups'))
+    BACKUP_PAGES_PER_STEP = int(os.environ.get('BACKUP_PAGES_PER_STEP', 100))
+    BACKUP_STEP_PAUSE = float(os.environ.get('BACKUP_STEP_PAUSE', 0.01))
+    
+    # Profiling configuration (disabled by default)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN', '')
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+    PROFILING_MAX_PROFILES = int(os.environ.get('PROFILING_MAX_PROFILES', 20))
     
     # Logging configuration
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
-    LOG_FILE = os.environ.get('LOG_FILE', str(BASE_DIR / 'app.log'))
+    LOG_FILE = os.environ.get('LOG_FILE', str(WRITABLE_DIR / 'app.log'))
@@ -1,3 +1,4 @@
+import argparse
 import sqlite3
 import logging
 from datetime import datetime
@@ -5,6 +6,61 @@ from app.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Stay well below SQLite's default limit of 999 bound parameters per statement
+QUERY_CHUNK_SIZE = 500
+
+# Summary tables kept current by triggers so counts never scan the users table.
+# INSERT OR IGNORE + UPDATE instead of upsert keeps this working on SQLite < 3.24.
+STATS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS user_stats (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    );
+    
+    CREATE TABLE IF NOT EXISTS user_signups_daily (
+        day TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    );
+    
+    CREATE TABLE IF NOT EXISTS user_signups_hourly (
+        hour TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    );
+    
+    CREATE TRIGGER IF NOT EXISTS users_stats_insert AFTER INSERT ON users
+    BEGIN
+        INSERT OR IGNORE INTO user_stats (name, value) VALUES ('total', 0);
+        UPDATE user_stats SET value = value + 1 WHERE name = 'total';
+        INSERT OR IGNORE INTO user_signups_daily (day, count) VALUES (date(NEW.created_at), 0);
+        UPDATE user_signups_daily SET count = count + 1 WHERE day = date(NEW.created_at);
+        INSERT OR IGNORE INTO user_signups_hourly (hour, count)
+            VALUES (strftime('%Y-%m-%d %H:00', NEW.created_at), 0);
+        UPDATE user_signups_hourly SET count = count + 1
+            WHERE hour = strftime('%Y-%m-%d %H:00', NEW.created_at);
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS users_stats_delete AFTER DELETE ON users
+    BEGIN
+        UPDATE user_stats SET value = value - 1 WHERE name = 'total';
+        UPDATE user_signups_daily SET count = count - 1 WHERE day = date(OLD.created_at);
+        UPDATE user_signups_hourly SET count = count - 1
+            WHERE hour = strftime('%Y-%m-%d %H:00', OLD.created_at);
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS users_stats_update AFTER UPDATE OF created_at ON users
+    BEGIN
+        UPDATE user_signups_daily SET count = count - 1 WHERE day = date(OLD.created_at);
+        UPDATE user_signups_hourly SET count = count - 1
+            WHERE hour = strftime('%Y-%m-%d %H:00', OLD.created_at);
+        INSERT OR IGNORE INTO user_signups_daily (day, count) VALUES (date(NEW.created_at), 0);
+        UPDATE user_signups_daily SET count = count + 1 WHERE day = date(NEW.created_at);
+        INSERT OR IGNORE INTO user_signups_hourly (hour, count)
+            VALUES (strftime('%Y-%m-%d %H:00', NEW.created_at), 0);
+        UPDATE user_signups_hourly SET count = count + 1
+            WHERE hour = strftime('%Y-%m-%d %H:00', NEW.created_at);
+    END;
+'''
+
 def get_db_connection():
     """Get database connection"""
     conn = sqlite3.connect(Config().DATABASE_PATH)
@@ -26,9 +82,17 @@ def init_db():
             )
         ''')
         
-        # Insert sample data if table is empty
-        count = conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
-        if count == 0:
+        # Create summary tables and the triggers that maintain them
+        conn.executescript(STATS_SCHEMA)
+        
+        # Databases created before the summary tables existed need a backfill
+        total = conn.execute("SELECT value FROM user_stats WHERE name = 'total'").fetchone()
+        if total is None:
+            _rebuild_user_stats(conn)
+        
+        # Insert sample data if table is empty (checked directly, so drifted stats can't cause a reseed)
+        has_users = conn.execute('SELECT EXISTS (SELECT 1 FROM users)').fetchone()[0]
+        if not has_users:
             sample_users = [
                 ('John Doe', 'john@example.com'),
                 ('Jane Smith', 'jane@example.com'),
@@ -48,6 +112,74 @@ def init_db():
         logger.error(f"Error initializing database: {str(e)}")
         raise
 
+def _rebuild_user_stats(conn):
+    """Recompute all summary tables from the users table"""
+    conn.execute('DELETE FROM user_stats')
+    conn.execute('DELETE FROM user_signups_daily')
+    conn.execute('DELETE FROM user_signups_hourly')
+    conn.execute("INSERT INTO user_stats (name, value) SELECT 'total', COUNT(*) FROM users")
+    conn.execute('''
+        INSERT INTO user_signups_daily (day, count)
+        SELECT date(created_at), COUNT(*) FROM users GROUP BY date(created_at)
+    ''')
+    conn.execute('''
+        INSERT INTO user_signups_hourly (hour, count)
+        SELECT strftime('%Y-%m-%d %H:00', created_at), COUNT(*) FROM users
+        GROUP BY strftime('%Y-%m-%d %H:00', created_at)
+    ''')
+
+# Each query returns summary rows that disagree with the users table, or vice versa
+STATS_DRIFT_QUERIES = [
+    '''
+        SELECT 'total', value FROM user_stats WHERE name = 'total'
+        EXCEPT SELECT 'total', COUNT(*) FROM users
+    ''',
+    '''
+        SELECT day, count FROM user_signups_daily WHERE count != 0
+        EXCEPT SELECT date(created_at), COUNT(*) FROM users GROUP BY date(created_at)
+    ''',
+    '''
+        SELECT date(created_at), COUNT(*) FROM users GROUP BY date(created_at)
+        EXCEPT SELECT day, count FROM user_signups_daily WHERE count != 0
+    ''',
+    '''
+        SELECT hour, count FROM user_signups_hourly WHERE count != 0
+        EXCEPT SELECT strftime('%Y-%m-%d %H:00', created_at), COUNT(*) FROM users
+        GROUP BY strftime('%Y-%m-%d %H:00', created_at)
+    ''',
+    '''
+        SELECT strftime('%Y-%m-%d %H:00', created_at), COUNT(*) FROM users
+        GROUP BY strftime('%Y-%m-%d %H:00', created_at)
+        EXCEPT SELECT hour, count FROM user_signups_hourly WHERE count != 0
+    '''
+]
+
+def repair_user_stats():
+    """Rebuild the summary tables if any total or bucket disagrees with the users table.
+
+    Returns True when a repair was needed.
+    """
+    try:
+        conn = get_db_connection()
+        with conn:
+            # Hold the write lock so no insert lands between the check and the rebuild
+            conn.execute('BEGIN IMMEDIATE')
+            total = conn.execute("SELECT value FROM user_stats WHERE name = 'total'").fetchone()
+            repaired = total is None or any(
+                conn.execute(query).fetchone() is not None for query in STATS_DRIFT_QUERIES
+            )
+            if repaired:
+                _rebuild_user_stats(conn)
+        conn.close()
+        
+        if repaired:
+            logger.warning("Repaired user stats from the users table")
+        return repaired
+        
+    except Exception as e:
+        logger.error(f"Error repairing user stats: {str(e)}")
+        raise
+
 def create_user(name, email):
     """Create a new user"""
     try:
@@ -70,13 +202,16 @@ def create_user(name, email):
         logger.error(f"Error creating user: {str(e)}")
         raise
 
-def get_all_users():
-    """Get all users from database"""
+def get_all_users(limit=None, offset=0):
+    """Get all users from database, optionally one page at a time"""
     try:
         conn = get_db_connection()
-        users = conn.execute(
-            'SELECT id, name, email, created_at FROM users ORDER BY created_at DESC'
-        ).fetchall()
+        query = 'SELECT id, name, email, created_at FROM users ORDER BY created_at DESC'
+        params = ()
+        if limit is not None:
+            query += ' LIMIT ? OFFSET ?'
+            params = (limit, offset)
+        users = conn.execute(query, params).fetchall()
         conn.close()
         
         return [dict(user) for user in users]
@@ -100,3 +235,111 @@ def get_user_by_id(user_id):
     except Exception as e:
         logger.error(f"Error fetching user {user_id}: {str(e)}")
         raise
+
+def get_users_by_ids(user_ids):
+    """Get many users by ID, returning (users in request order, missing IDs)"""
+    try:
+        unique_ids = list(dict.fromkeys(user_ids))
+        found = {}
+        
+        conn = get_db_connection()
+        for start in range(0, len(unique_ids), QUERY_CHUNK_SIZE):
+            chunk = unique_ids[start:start + QUERY_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            rows = conn.execute(
+                f'SELECT id, name, email, created_at FROM users WHERE id IN ({placeholders})',
+                chunk
+            ).fetchall()
+            for row in rows:
+                found[row['id']] = dict(row)
+        conn.close()
+        
+        users = [found[user_id] for user_id in unique_ids if user_id in found]
+        missing = [user_id for user_id in unique_ids if user_id not in found]
+        return users, missing
+        
+    except Exception as e:
+        logger.error(f"Error fetching users {user_ids}: {str(e)}")
+        raise
+
+def iter_users(chunk_size=500):
+    """Yield all users ordered by ID, reading the table in fixed-size chunks"""
+    conn = get_db_connection()
+    try:
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                'SELECT id, name, email, created_at FROM users WHERE id > ? ORDER BY id LIMIT ?',
+                (last_id, chunk_size)
+            ).fetchall()
+            if not rows:
+                break
+            
+            for row in rows:
+                yield dict(row)
+            last_id = rows[-1]['id']
+            
+    except Exception as e:
+        logger.error(f"Error exporting users: {str(e)}")
+        raise
+    finally:
+        conn.close()
+
+def get_user_count():
+    """Get the total number of users from the summary table"""
+    try:
+        conn = get_db_connection()
+        total = conn.execute("SELECT value FROM user_stats WHERE name = 'total'").fetchone()
+        conn.close()
+        
+        return total[0] if total else 0
+        
+    except Exception as e:
+        logger.error(f"Error fetching user count: {str(e)}")
+        raise
+
+def get_user_stats(days=30, hours=24):
+    """Get total users and signup counts for the last N days and hours (UTC)"""
+    try:
+        conn = get_db_connection()
+        total = conn.execute("SELECT value FROM user_stats WHERE name = 'total'").fetchone()
+        daily = conn.execute(
+            '''
+                SELECT day, count FROM user_signups_daily
+                WHERE day > date('now', ?) AND count > 0 ORDER BY day DESC
+            ''',
+            (f'-{days} days',)
+        ).fetchall()
+        hourly = conn.execute(
+            '''
+                SELECT hour, count FROM user_signups_hourly
+                WHERE hour > strftime('%Y-%m-%d %H:00', 'now', ?) AND count > 0 ORDER BY hour DESC
+            ''',
+            (f'-{hours} hours',)
+        ).fetchall()
+        conn.close()
+        
+        return {
+            "total": total[0] if total else 0,
+            "signups_per_day": [dict(row) for row in daily],
+            "signups_per_hour": [dict(row) for row in hourly]
+        }
+        
+    except Exception as e:
+        logger.error(f"Error fetching user stats: {str(e)}")
+        raise
+
+def main(argv=None):
+    """Command line entry point: python -m app.models repair-stats"""
+    parser = argparse.ArgumentParser(description="Database maintenance tasks")
+    parser.add_argument('command', choices=['repair-stats'],
+                        help="repair-stats: rebuild user summary tables that drifted from the users table")
+    parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    init_db()
+    repaired = repair_user_stats()
+    print("User stats repaired" if repaired else "User stats already consistent")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+import cProfile
+import hmac
+import logging
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from flask import Response, g, jsonify, request
+from app.utils import parse_non_negative_int
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile-Token'
+
+# Report sort orders mapped to their index in a pstats entry
+SORT_KEYS = {'cumulative': 3, 'tottime': 2}
+
+class ProfileStore:
+    """Thread-safe store of the last N request profiles"""
+    
+    def __init__(self, max_profiles):
+        self._profiles = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+    
+    def add(self, method, path, duration_ms, stats):
+        with self._lock:
+            self._profiles.append({
+                "method": method,
+                "path": path,
+                "duration_ms": duration_ms,
+                "timestamp": datetime.utcnow().isoformat(),
+                "stats": stats
+            })
+    
+    def snapshot(self):
+        with self._lock:
+            return list(self._profiles)
+    
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+class _RawStats:
+    """Adapter letting pstats.Stats load a previously captured stats dict"""
+    
+    def __init__(self, stats):
+        self.stats = stats
+    
+    def create_stats(self):
+        pass
+
+def _function_label(func):
+    """Format a pstats function key as file:line(name)"""
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f"{filename}:{line}({name})"
+
+def aggregate_stats(profiles):
+    """Merge the raw stats of several profiles into one pstats.Stats object"""
+    if not profiles:
+        return None
+    
+    # Start from an empty Stats so merging never mutates the stored profiles
+    merged = pstats.Stats()
+    for profile in profiles:
+        merged.add(pstats.Stats(_RawStats(profile["stats"])))
+    return merged
+
+def top_functions(profiles, limit=20, sort='cumulative'):
+    """Return the hottest functions across the given profiles"""
+    merged = aggregate_stats(profiles)
+    if merged is None:
+        return []
+    
+    sort_index = SORT_KEYS[sort]
+    rows = sorted(merged.stats.items(), key=lambda item: item[1][sort_index], reverse=True)
+    return [
+        {
+            "function": _function_label(func),
+            "calls": nc,
+            "primitive_calls": cc,
+            "total_time_ms": round(tt * 1000, 3),
+            "cumulative_time_ms": round(ct * 1000, 3)
+        }
+        for func, (cc, nc, tt, ct, _callers) in rows[:limit]
+    ]
+
+def collapsed_stacks(profiles):
+    """Build flamegraph-ready collapsed stacks (microseconds) from the call graph.
+
+    cProfile records caller/callee edges rather than full stacks, so each
+    function's time is apportioned across the paths that reach it.
+    """
+    merged = aggregate_stats(profiles)
+    if merged is None:
+        return ''
+    
+    children = {}
+    for func, (_cc, _nc, _tt, _ct, callers) in merged.stats.items():
+        for caller, caller_stats in callers.items():
+            children.setdefault(caller, []).append((func, caller_stats[3]))
+    
+    roots = [func for func, entry in merged.stats.items() if not entry[4]]
+    totals = {}
+    
+    def walk(func, path, budget):
+        cc, nc, tt, ct, _callers = merged.stats[func]
+        fraction = budget / ct if ct else 0
+        stack = path + [_function_label(func)]
+        key = ';'.join(stack)
+        totals[key] = totals.get(key, 0) + tt * fraction
+        for child, child_ct in children.get(func, []):
+            if _function_label(child) not in stack:
+                walk(child, stack, child_ct * fraction)
+    
+    for root in roots:
+        walk(root, [], merged.stats[root][3])
+    
+    lines = [f"{stack} {int(seconds * 1_000_000)}" for stack, seconds in totals.items()
+             if int(seconds * 1_000_000) > 0]
+    return '\n'.join(sorted(lines)) + '\n'
+
+def init_profiling(app):
+    """Register profiling hooks and admin endpoints; only called when enabled"""
+    store = ProfileStore(app.config['PROFILING_MAX_PROFILES'])
+    token = app.config['PROFILING_TOKEN']
+    sample_rate = app.config['PROFILING_SAMPLE_RATE']
+    # Only one profiler can be active per interpreter at a time
+    profiler_lock = threading.Lock()
+    
+    def authorized():
+        # Without a configured token the admin endpoints stay closed; compare
+        # bytes because compare_digest rejects non-ASCII str arguments
+        supplied = request.headers.get(PROFILE_HEADER, '')
+        return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+    
+    def should_profile():
+        if authorized():
+            return True
+        return sample_rate > 0 and random.random() < sample_rate
+    
+    @app.before_request
+    def start_profile():
+        if request.path.startswith('/api/v1/admin/profiles') or not should_profile():
+            return
+        if not profiler_lock.acquire(blocking=False):
+            return
+        g.profiler = cProfile.Profile()
+        g.profile_started = time.perf_counter()
+        g.profiler.enable()
+    
+    @app.teardown_request
+    def stop_profile(exc):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        try:
+            profiler.disable()
+            profiler.create_stats()
+            duration_ms = (time.perf_counter() - g.pop('profile_started')) * 1000
+            store.add(request.method, request.path, round(duration_ms, 3), profiler.stats)
+            logger.info(f"Profiled {request.method} {request.path} in {duration_ms:.1f}ms")
+        finally:
+            profiler_lock.release()
+    
+    @app.route('/api/v1/admin/profiles', methods=['GET', 'DELETE'])
+    def profiles_report():
+        """Aggregated hot-path report over the stored profiles"""
+        if not authorized():
+            return jsonify({"error": "Forbidden"}), 403
+        
+        if request.method == 'DELETE':
+            store.clear()
+            return jsonify({"message": "Profiles cleared"}), 200
+        
+        profiles = store.snapshot()
+        limit, limit_error = parse_non_negative_int(request.args.get('limit'), default=20)
+        if limit_error:
+            return jsonify({"error": "limit must be a non-negative integer"}), 400
+        
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in SORT_KEYS:
+            return jsonify({"error": f"sort must be one of: {', '.join(SORT_KEYS)}"}), 400
+        return jsonify({
+            "profile_count": len(profiles),
+            "requests": [
+                {key: profile[key] for key in ("method", "path", "duration_ms", "timestamp")}
+                for profile in profiles
+            ],
+            "top_functions": top_functions(profiles, limit=limit, sort=sort),
+            "timestamp": datetime.utcnow().isoformat()
+        }), 200
+    
+    @app.route('/api/v1/admin/profiles/collapsed', methods=['GET'])
+    def profiles_collapsed():
+        """Collapsed-stack dump of the stored profiles for flamegraph tools"""
+        if not authorized():
+            return jsonify({"error": "Forbidden"}), 403
+        
+        return Response(collapsed_stacks(store.snapshot()), mimetype='text/plain')
+    
+    app.extensions['profile_store'] = store
+    logger.info(f"Request profiling enabled (sample rate {sample_rate})")
+    return store
@@ -0,0 +1,114 @@
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Set once the database has been hydrated in this container
+_hydrated = False
+
+def resolve_snapshot_path(path):
+    """Resolve a bundled snapshot path relative to the package directory"""
+    if os.path.isabs(path):
+        return path
+    return str(Config().BASE_DIR / path)
+
+def download_snapshot(bucket, key, dest_path, endpoint_url=None):
+    """Download a database snapshot from an S3-compatible store (e.g. LocalStack)"""
+    import boto3
+    
+    client = boto3.client('s3', endpoint_url=endpoint_url or None)
+    client.download_file(bucket, key, dest_path)
+    logger.info(f"Downloaded database snapshot s3://{bucket}/{key}")
+
+def hydrate_database():
+    """Populate DATABASE_PATH from a prebuilt snapshot once per container.
+
+    Returns True when a snapshot was copied in, False when the database was
+    already present or no snapshot source is configured.
+    """
+    global _hydrated
+    config = Config()
+    
+    if _hydrated or os.path.exists(config.DATABASE_PATH):
+        _hydrated = True
+        return False
+    
+    os.makedirs(os.path.dirname(os.path.abspath(config.DATABASE_PATH)), exist_ok=True)
+    tmp_path = f'{config.DATABASE_PATH}.partial'
+    
+    try:
+        if config.DB_SNAPSHOT_S3_BUCKET:
+            download_snapshot(
+                config.DB_SNAPSHOT_S3_BUCKET,
+                config.DB_SNAPSHOT_S3_KEY,
+                tmp_path,
+                endpoint_url=config.S3_ENDPOINT_URL
+            )
+        elif config.DB_SNAPSHOT_PATH:
+            shutil.copyfile(resolve_snapshot_path(config.DB_SNAPSHOT_PATH), tmp_path)
+            logger.info(f"Copied bundled database snapshot {config.DB_SNAPSHOT_PATH}")
+        else:
+            return False
+        
+        # Rename into place so a partially written file is never opened
+        os.replace(tmp_path, config.DATABASE_PATH)
+        _hydrated = True
+        logger.info(f"Database hydrated at {config.DATABASE_PATH}")
+        return True
+        
+    except Exception as e:
+        # Fall back to init_db() building the database from scratch
+        logger.warning(f"Database snapshot hydration failed: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+def upload_snapshot(source_path, bucket, key, endpoint_url=None):
+    """Upload a database snapshot to an S3-compatible store"""
+    import boto3
+    
+    client = boto3.client('s3', endpoint_url=endpoint_url or None)
+    client.upload_file(source_path, bucket, key)
+    logger.info(f"Uploaded database snapshot to s3://{bucket}/{key}")
+
+def build_snapshot(dest_path):
+    """Build a snapshot from a freshly initialized database.
+
+    The working DATABASE_PATH is never read, so local data on the build
+    machine cannot leak into a deployment package.
+    """
+    from app.backup import backup_database
+    from app.models import init_db
+    
+    original_path = Config.DATABASE_PATH
+    with tempfile.TemporaryDirectory() as build_dir:
+        Config.DATABASE_PATH = os.path.join(build_dir, 'data.db')
+        try:
+            init_db()
+            return backup_database(dest_path, pause=0)
+        finally:
+            Config.DATABASE_PATH = original_path
+
+def main(argv=None):
+    """Command line entry point: python -m app.storage <destination> [--upload]"""
+    parser = argparse.ArgumentParser(description="Build a database snapshot for Lambda deployments")
+    parser.add_argument('destination', help="Snapshot file path, e.g. lambda-package/snapshot.db")
+    parser.add_argument('--upload', action='store_true',
+                        help="Also upload to DB_SNAPSHOT_S3_BUCKET/DB_SNAPSHOT_S3_KEY")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    path = build_snapshot(args.destination)
+    
+    if args.upload:
+        config = Config()
+        upload_snapshot(path, config.DB_SNAPSHOT_S3_BUCKET, config.DB_SNAPSHOT_S3_KEY,
+                        endpoint_url=config.S3_ENDPOINT_URL)
+    print(path)
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,9 @@ import logging
 import re
 from app.config import Config
 
+# Largest value SQLite can store in an INTEGER column
+MAX_SQLITE_INTEGER = 2 ** 63 - 1
+
 def setup_logging():
     """Setup application logging"""
     config = Config()
@@ -36,3 +39,47 @@ def validate_user_data(data):
         return "Name must be between 2 and 50 characters"
     
     return None
+
+def parse_user_ids(raw_ids, max_batch_size):
+    """Parse a list or comma-separated string of user IDs, returning (ids, error)"""
+    if raw_ids is None:
+        return None, "No user IDs provided"
+    
+    if isinstance(raw_ids, str):
+        raw_ids = [part.strip() for part in raw_ids.split(',') if part.strip()]
+    
+    if not isinstance(raw_ids, list):
+        return None, "User IDs must be a list"
+    
+    user_ids = []
+    for raw_id in raw_ids:
+        if isinstance(raw_id, bool):
+            return None, f"Invalid user ID: {raw_id}"
+        try:
+            user_id = int(raw_id)
+        except (TypeError, ValueError):
+            return None, f"Invalid user ID: {raw_id}"
+        if user_id < 1 or user_id > MAX_SQLITE_INTEGER or (isinstance(raw_id, float) and raw_id != user_id):
+            return None, f"Invalid user ID: {raw_id}"
+        user_ids.append(user_id)
+    
+    # Duplicates cost nothing in the query, so only distinct IDs count towards the limit
+    user_ids = list(dict.fromkeys(user_ids))
+    
+    if not user_ids:
+        return None, "No user IDs provided"
+    
+    if len(user_ids) > max_batch_size:
+        return None, f"Too many user IDs (maximum {max_batch_size})"
+    
+    return user_ids, None
+
+def parse_non_negative_int(raw_value, default=None):
+    """Parse an optional non-negative integer query parameter, returning (value, error)"""
+    if raw_value is None:
+        return default, None
+    
+    if not raw_value.isdecimal():
+        return None, f"Invalid non-negative integer: {raw_value}"
+    
+    return int(raw_value), None
@@ -33,6 +33,24 @@ def create_lambda_package():
         else:
             print(f"⚠️  Warning: {file} not found")
     
+    # Copy the application package imported by app.py
+    if os.path.isdir("app"):
+        shutil.copytree("app", os.path.join(package_dir, "app"),
+                        ignore=shutil.ignore_patterns("__pycache__"))
+        print("📄 Added app/ to package")
+    else:
+        print("⚠️  Warning: app/ not found")
+    
+    # Bundle a prebuilt database snapshot hydrated into /tmp at cold start
+    try:
+        subprocess.run([
+            sys.executable, "-m", "app.storage",
+            os.path.join(package_dir, "snapshot.db")
+        ], check=True)
+        print("📄 Added snapshot.db to package")
+    except subprocess.CalledProcessError as e:
+        print(f"⚠️  Warning: Failed to build database snapshot: {e}")
+    
     # Install Flask if requirements.txt exists, otherwise install Flask directly
     print("📦 Installing Flask...")
     try:
@@ -68,8 +68,9 @@ resource "aws_lambda_function" "flask_api" {
 
   environment {
     variables = {
-      FLASK_ENV = "production"
-      LOG_LEVEL = "INFO"
+      FLASK_ENV        = "production"
+      LOG_LEVEL        = "INFO"
+      DB_SNAPSHOT_PATH = "snapshot.db"
     }
   }
 
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+# Make the repository root importable when pytest is run from any directory
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Keep the import-time init_db() and log file out of the working tree
+TEST_DIR = tempfile.mkdtemp(prefix='devops-api-tests-')
+os.environ.setdefault('DATABASE_PATH', os.path.join(TEST_DIR, 'data.db'))
+os.environ.setdefault('LOG_FILE', os.path.join(TEST_DIR, 'app.log'))
@@ -2,13 +2,19 @@ import pytest
 import json
 import tempfile
 import os
-from app import app
+import sqlite3
+import uuid
+# app.py is shadowed by the app/ package, so load it the same way Lambda does
+from lambda_handler import app
 from app.models import init_db
 
 @pytest.fixture
-def client():
+def client(monkeypatch):
     # Create a temporary database for testing
+    from app.config import Config
+    
     db_fd, app.config['DATABASE_PATH'] = tempfile.mkstemp()
+    monkeypatch.setattr(Config, 'DATABASE_PATH', app.config['DATABASE_PATH'])
     app.config['TESTING'] = True
     
     with app.test_client() as client:
@@ -130,3 +136,336 @@ def test_404_handler(client):
     
     data = json.loads(response.data)
     assert 'error' in data
+
+def test_batch_get_users_query(client):
+    """Test batch lookup via query string preserves order and reports missing IDs"""
+    response = client.get('/api/v1/users?ids=2,999,1')
+    assert response.status_code == 200
+    
+    data = json.loads(response.data)
+    assert [user['id'] for user in data['users']] == [2, 1]
+    assert data['missing'] == [999]
+    assert data['count'] == 2
+
+def test_batch_get_users_post(client):
+    """Test batch lookup via POST body"""
+    response = client.post('/api/v1/users/batch-get',
+                          data=json.dumps({'ids': [3, 1]}),
+                          content_type='application/json')
+    assert response.status_code == 200
+    
+    data = json.loads(response.data)
+    assert [user['id'] for user in data['users']] == [3, 1]
+    assert data['missing'] == []
+
+def test_batch_get_users_duplicates(client):
+    """Test duplicate IDs do not count towards the batch size limit"""
+    duplicates = [1] * (app.config['MAX_BATCH_SIZE'] + 1)
+    response = client.post('/api/v1/users/batch-get',
+                          data=json.dumps({'ids': duplicates}),
+                          content_type='application/json')
+    assert response.status_code == 200
+    
+    data = json.loads(response.data)
+    assert [user['id'] for user in data['users']] == [1]
+
+def test_batch_get_users_invalid(client):
+    """Test batch lookup rejects invalid and oversized requests"""
+    response = client.get('/api/v1/users?ids=1,abc')
+    assert response.status_code == 400
+    
+    response = client.get('/api/v1/users?ids=99999999999999999999')
+    assert response.status_code == 400
+    
+    response = client.post('/api/v1/users/batch-get',
+                          data=json.dumps([1, 2]),
+                          content_type='application/json')
+    assert response.status_code == 400
+    
+    too_many = list(range(1, app.config['MAX_BATCH_SIZE'] + 2))
+    response = client.post('/api/v1/users/batch-get',
+                          data=json.dumps({'ids': too_many}),
+                          content_type='application/json')
+    assert response.status_code == 400
+
+def test_export_users_csv(client):
+    """Test streaming user export as CSV"""
+    response = client.get('/api/v1/users/export?format=csv')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    
+    lines = response.get_data(as_text=True).strip().splitlines()
+    assert lines[0] == 'id,name,email,created_at'
+    assert len(lines) > 1
+
+def test_export_users_ndjson(client):
+    """Test streaming user export as NDJSON"""
+    response = client.get('/api/v1/users/export?format=ndjson')
+    assert response.status_code == 200
+    
+    users = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert users
+    assert [user['id'] for user in users] == sorted(user['id'] for user in users)
+
+def test_export_users_invalid_format(client):
+    """Test export rejects unsupported formats"""
+    response = client.get('/api/v1/users/export?format=xml')
+    assert response.status_code == 400
+
+def test_backup_database(tmp_path, monkeypatch):
+    """Test online backup produces a readable copy of the users table"""
+    from app.backup import backup_database
+    from app.config import Config
+    
+    monkeypatch.setattr(Config, 'DATABASE_PATH', str(tmp_path / 'data.db'))
+    init_db()
+    dest = backup_database(str(tmp_path / 'backup.db'), pages=1, pause=0)
+    
+    conn = sqlite3.connect(dest)
+    count = conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+    conn.close()
+    assert count > 0
+
+def make_profiled_app(token):
+    """Build a minimal Flask app with profiling hooks registered"""
+    from flask import Flask
+    from app.profiling import init_profiling
+    
+    profiled_app = Flask(__name__)
+    profiled_app.config.update(
+        PROFILING_TOKEN=token,
+        PROFILING_SAMPLE_RATE=0.0,
+        PROFILING_MAX_PROFILES=5
+    )
+    
+    @profiled_app.route('/work')
+    def work():
+        return {"total": sum(i * i for i in range(1000))}
+    
+    store = init_profiling(profiled_app)
+    return profiled_app, store
+
+def test_profiling_hooks():
+    """Test token-triggered profiling and the aggregated reports"""
+    profiled_app, store = make_profiled_app('secret')
+    client = profiled_app.test_client()
+    
+    client.get('/work')
+    assert store.snapshot() == []
+    
+    client.get('/work', headers={'X-Profile-Token': 'secret'})
+    assert len(store.snapshot()) == 1
+    
+    response = client.get('/api/v1/admin/profiles')
+    assert response.status_code == 403
+    
+    response = client.get('/api/v1/admin/profiles', headers={'X-Profile-Token': 'secret'})
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['profile_count'] == 1
+    assert data['top_functions']
+    
+    response = client.get('/api/v1/admin/profiles/collapsed', headers={'X-Profile-Token': 'secret'})
+    assert response.status_code == 200
+    assert 'work' in response.get_data(as_text=True)
+
+def test_profiling_admin_closed_without_token():
+    """Test admin endpoints refuse access when no token is configured"""
+    profiled_app, store = make_profiled_app('')
+    client = profiled_app.test_client()
+    
+    assert client.get('/api/v1/admin/profiles').status_code == 403
+    assert client.delete('/api/v1/admin/profiles').status_code == 403
+    assert client.get('/api/v1/admin/profiles/collapsed').status_code == 403
+
+def test_profiling_rejects_bad_input():
+    """Test non-ASCII tokens and invalid report arguments do not cause errors"""
+    profiled_app, store = make_profiled_app('secret')
+    client = profiled_app.test_client()
+    
+    response = client.get('/work', headers={'X-Profile-Token': 'é'.encode('utf-8').decode('latin-1')})
+    assert response.status_code == 200
+    assert store.snapshot() == []
+    
+    headers = {'X-Profile-Token': 'secret'}
+    assert client.get('/api/v1/admin/profiles?limit=-1', headers=headers).status_code == 400
+    assert client.get('/api/v1/admin/profiles?sort=calls', headers=headers).status_code == 400
+    assert client.get('/api/v1/admin/profiles?sort=tottime', headers=headers).status_code == 200
+
+def test_hydrate_database_from_bundled_snapshot(tmp_path, monkeypatch):
+    """Test the database is hydrated from a bundled snapshot only once"""
+    from app import storage
+    from app.config import Config
+    
+    snapshot = tmp_path / 'snapshot.db'
+    conn = sqlite3.connect(snapshot)
+    conn.execute('CREATE TABLE users (id INTEGER PRIMARY KEY)')
+    conn.commit()
+    conn.close()
+    
+    target = tmp_path / 'tmp' / 'data.db'
+    monkeypatch.setattr(Config, 'DATABASE_PATH', str(target))
+    monkeypatch.setattr(Config, 'DB_SNAPSHOT_PATH', str(snapshot))
+    monkeypatch.setattr(Config, 'DB_SNAPSHOT_S3_BUCKET', '')
+    monkeypatch.setattr(storage, '_hydrated', False)
+    
+    assert storage.hydrate_database() is True
+    assert target.exists()
+    assert storage.hydrate_database() is False
+
+def test_lambda_warmup_event():
+    """Test keep-warm pings are answered without routing through Flask"""
+    from lambda_handler import lambda_handler, is_warmup_event
+    
+    event = {'source': 'aws.events', 'detail-type': 'Scheduled Event'}
+    assert is_warmup_event(event)
+    assert not is_warmup_event({'httpMethod': 'GET', 'path': '/'})
+    
+    response = lambda_handler(event, None)
+    assert response['statusCode'] == 200
+    assert json.loads(response['body']) == {'message': 'warm'}
+
+@pytest.fixture
+def isolated_db(tmp_path, monkeypatch):
+    """Point the models at a fresh temporary database"""
+    from app.config import Config
+    
+    monkeypatch.setattr(Config, 'DATABASE_PATH', str(tmp_path / 'data.db'))
+    init_db()
+    return tmp_path / 'data.db'
+
+def test_users_stats_endpoint(client, isolated_db):
+    """Test user stats are maintained by triggers"""
+    before = json.loads(client.get('/api/v1/users/stats').data)
+    
+    response = client.post('/api/v1/users',
+                          data=json.dumps({'name': 'Stats User', 'email': f'stats-{uuid.uuid4().hex}@example.com'}),
+                          content_type='application/json')
+    assert response.status_code == 201
+    
+    response = client.get('/api/v1/users/stats')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['total'] == before['total'] + 1
+    assert sum(day['count'] for day in data['signups_per_day']) == data['total']
+
+def test_users_stats_time_window(client, isolated_db):
+    """Test stats only report buckets inside the requested time window"""
+    from app.models import get_db_connection
+    
+    conn = get_db_connection()
+    conn.execute("INSERT INTO users (name, email, created_at) VALUES ('Old User', 'old@example.com', '1999-01-01 10:00:00')")
+    conn.commit()
+    conn.close()
+    
+    data = json.loads(client.get('/api/v1/users/stats?days=30&hours=24').data)
+    assert data['total'] == 4
+    assert '1999-01-01' not in [day['day'] for day in data['signups_per_day']]
+    assert '1999-01-01 10:00' not in [hour['hour'] for hour in data['signups_per_hour']]
+    assert sum(day['count'] for day in data['signups_per_day']) == 3
+
+def test_repair_stats_command(isolated_db, capsys):
+    """Test the repair-stats command line entry point"""
+    from app.models import get_db_connection, main
+    
+    conn = get_db_connection()
+    conn.execute("UPDATE user_stats SET value = 0 WHERE name = 'total'")
+    conn.commit()
+    conn.close()
+    
+    main(['repair-stats'])
+    assert 'repaired' in capsys.readouterr().out
+    
+    main(['repair-stats'])
+    assert 'already consistent' in capsys.readouterr().out
+
+def test_users_count_only(client, isolated_db):
+    """Test listing with limit=0 returns the total without rows"""
+    response = client.get('/api/v1/users?limit=0')
+    assert response.status_code == 200
+    
+    data = json.loads(response.data)
+    assert data['users'] == []
+    assert data['count'] == 3
+
+def test_users_invalid_pagination(client, isolated_db):
+    """Test non-integer pagination parameters are rejected"""
+    assert client.get('/api/v1/users?limit=abc').status_code == 400
+    assert client.get('/api/v1/users?offset=-1').status_code == 400
+    assert client.get('/api/v1/users/stats?days=abc').status_code == 400
+
+def test_repair_user_stats(isolated_db):
+    """Test the repair routine fixes drifted totals and buckets"""
+    from app.models import get_db_connection, get_user_stats, repair_user_stats
+    
+    assert repair_user_stats() is False
+    
+    conn = get_db_connection()
+    conn.execute("UPDATE user_stats SET value = value + 5 WHERE name = 'total'")
+    conn.commit()
+    conn.close()
+    
+    assert repair_user_stats() is True
+    assert repair_user_stats() is False
+    
+    # Move a count to another day without changing the overall sum
+    conn = get_db_connection()
+    conn.execute('UPDATE user_signups_daily SET count = count - 1')
+    conn.execute("INSERT INTO user_signups_daily (day, count) VALUES ('1999-01-01', 1)")
+    conn.commit()
+    conn.close()
+    
+    assert repair_user_stats() is True
+    days = [day['day'] for day in get_user_stats()['signups_per_day']]
+    assert '1999-01-01' not in days
+
+def test_lambda_handler_hydrates_tmp_database(tmp_path, monkeypatch):
+    """Test an API event through lambda_handler serves the real app from a hydrated database"""
+    import importlib
+    import lambda_handler
+    from app import storage
+    from app.config import Config
+    
+    snapshot = tmp_path / 'snapshot.db'
+    monkeypatch.setattr(Config, 'DATABASE_PATH', str(snapshot))
+    init_db()
+    conn = sqlite3.connect(snapshot)
+    conn.execute("INSERT INTO users (name, email) VALUES ('Snapshot User', 'snapshot@example.com')")
+    conn.commit()
+    conn.close()
+    
+    lambda_tmp = tmp_path / 'tmp'
+    monkeypatch.setattr(Config, 'IS_LAMBDA', True)
+    monkeypatch.setattr(Config, 'DATABASE_PATH', str(lambda_tmp / 'data.db'))
+    monkeypatch.setattr(Config, 'DB_SNAPSHOT_PATH', str(snapshot))
+    monkeypatch.setattr(Config, 'DB_SNAPSHOT_S3_BUCKET', '')
+    monkeypatch.setattr(storage, '_hydrated', False)
+    
+    # Reloading simulates a cold start, re-running app.py with the patched config
+    importlib.reload(lambda_handler)
+    response = lambda_handler.lambda_handler({'httpMethod': 'GET', 'path': '/api/v1/users'}, None)
+    
+    assert response['statusCode'] == 200
+    emails = [user['email'] for user in json.loads(response['body'])['users']]
+    assert 'snapshot@example.com' in emails
+    assert (lambda_tmp / 'data.db').exists()
+
+def test_build_snapshot_ignores_working_database(tmp_path, monkeypatch):
+    """Test snapshots are built from a fresh database, not the local one"""
+    from app.config import Config
+    from app.storage import build_snapshot
+    
+    monkeypatch.setattr(Config, 'DATABASE_PATH', str(tmp_path / 'data.db'))
+    init_db()
+    conn = sqlite3.connect(tmp_path / 'data.db')
+    conn.execute("INSERT INTO users (name, email) VALUES ('Local User', 'private@corp.example')")
+    conn.commit()
+    conn.close()
+    
+    snapshot = build_snapshot(str(tmp_path / 'snapshot.db'))
+    
+    conn = sqlite3.connect(snapshot)
+    emails = [row[0] for row in conn.execute('SELECT email FROM users')]
+    conn.close()
+    assert 'private@corp.example' not in emails
+    assert Config.DATABASE_PATH == str(tmp_path / 'data.db')